@@ -0,0 +1,169 @@
+# Benchmark for the shared-memory market snapshot (bot/market_feed.py)
+#
+# First times read_raw() and read() in a single process with no writer running,
+# then starts one writer (this process) and N reader processes on a private
+# segment for each N. Every read is timed individually; the script reports
+# per-read mean/p50/p99/max latency, publisher updates/s and the number of torn
+# reads (records that mixed two updates).
+#
+# Usage: python bench/market_feed_bench.py --readers 1 2 4 8 --duration 2
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.market_feed import MarketSnapshotReader, MarketSnapshotWriter
+
+SYMBOL = "BTCUSDT"
+METHODS = ("read_raw", "read")
+# Index of bid, ask, mark_price, open and close in read_raw() values
+RAW_PRICE_FIELDS = (0, 1, 2, 4, 7)
+PRICE_FIELDS = ('bid', 'ask', 'mark_price', 'open', 'close')
+
+
+def _write(writer, price):
+    # Every price field gets the same value, so a torn read shows up as a mismatch
+    writer.update(SYMBOL, bid=price, ask=price, mark_price=price, open=price, close=price)
+
+
+def _is_torn(method, result):
+    if method == "read_raw":
+        values = result[2]
+        return any(values[i] != values[0] for i in RAW_PRICE_FIELDS)
+    snapshot, error = result
+    if error:
+        return True
+    return any(snapshot[f] != snapshot['bid'] for f in PRICE_FIELDS)
+
+
+def _timed_reads(reader, method, keep_going):
+    # Time each call on its own; the samples include one perf_counter_ns() call
+    call = getattr(reader, method)
+    clock = time.perf_counter_ns
+    samples = []
+    torn = 0
+    while keep_going():
+        for _ in range(1000):
+            t0 = clock()
+            result = call(SYMBOL)
+            samples.append(clock() - t0)
+            if _is_torn(method, result):
+                torn += 1
+    return samples, torn
+
+
+def _stats(samples):
+    samples.sort()
+    n = len(samples)
+    return {
+        'count': n,
+        'mean': sum(samples) / n,
+        'p50': samples[n // 2],
+        'p99': samples[min(n - 1, n * 99 // 100)],
+        'max': samples[-1],
+    }
+
+
+def reader_proc(name, method, ready, start, stop, results):
+    reader = MarketSnapshotReader(name, max_age=float('inf'))
+    ready.release()
+    start.wait()
+    samples, torn = _timed_reads(reader, method, lambda: not stop.is_set())
+    reader.close()
+    stats = _stats(samples)
+    stats['torn'] = torn
+    results.put(stats)
+
+
+def timer_overhead():
+    clock = time.perf_counter_ns
+    samples = []
+    for _ in range(100000):
+        t0 = clock()
+        samples.append(clock() - t0)
+    return _stats(samples)['p50']
+
+
+def run_uncontended(method, duration):
+    name = f"market_feed_bench_{os.getpid()}"
+    writer = MarketSnapshotWriter([SYMBOL], name=name)
+    try:
+        _write(writer, 1.0)
+        reader = MarketSnapshotReader(name, max_age=float('inf'))
+        deadline = time.perf_counter() + duration
+        samples, torn = _timed_reads(reader, method, lambda: time.perf_counter() < deadline)
+        reader.close()
+    finally:
+        writer.close()
+    stats = _stats(samples)
+    stats['torn'] = torn
+    return stats
+
+
+def run_contended(method, n_readers, duration):
+    name = f"market_feed_bench_{os.getpid()}"
+    writer = MarketSnapshotWriter([SYMBOL], name=name)
+    _write(writer, 0.0)
+    ready = mp.Semaphore(0)
+    start = mp.Event()
+    stop = mp.Event()
+    results = mp.Queue()
+    procs = [mp.Process(target=reader_proc, args=(name, method, ready, start, stop, results)) for _ in range(n_readers)]
+    try:
+        for p in procs:
+            p.start()
+        for _ in procs:
+            ready.acquire()
+        start.set()
+        updates = 0
+        t0 = time.perf_counter()
+        deadline = t0 + duration
+        while time.perf_counter() < deadline:
+            for _ in range(100):
+                _write(writer, float(updates))
+                updates += 1
+        elapsed = time.perf_counter() - t0
+        stop.set()
+        stats = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+    finally:
+        stop.set()
+        writer.close()
+    return updates / elapsed, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared-memory market snapshot.")
+    parser.add_argument("--readers", type=int, nargs="+", default=[1, 2, 4, 8], help="reader process counts to run")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per run")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count()
+    print(f"CPUs: {cpus}, Python {sys.version.split()[0]}, {args.duration}s per run")
+    print(f"Timer overhead (included in every sample): {timer_overhead()} ns")
+    print("Uncontended (one process, no writer running):")
+    for method in METHODS:
+        s = run_uncontended(method, args.duration)
+        print(f"  {method:8}: mean {s['mean']:,.0f} ns, p50 {s['p50']:,} ns, p99 {s['p99']:,} ns, max {s['max']:,} ns, "
+              f"{s['count']:,} reads, torn={s['torn']}")
+    for n in args.readers:
+        note = f" (exceeds {cpus} CPUs, includes time-slicing)" if n + 1 > cpus else ""
+        print(f"N={n} readers + 1 writer{note}:")
+        for method in METHODS:
+            update_rate, stats = run_contended(method, n, args.duration)
+            reads = sum(s['count'] for s in stats)
+            mean = sum(s['mean'] * s['count'] for s in stats) / reads
+            p50 = max(s['p50'] for s in stats)
+            p99 = max(s['p99'] for s in stats)
+            worst = max(s['max'] for s in stats)
+            torn = sum(s['torn'] for s in stats)
+            print(f"  {method:8}: mean {mean:,.0f} ns, p50/p99/max of worst reader {p50:,}/{p99:,}/{worst:,} ns, "
+                  f"{reads:,} reads, publisher {update_rate:,.0f} updates/s, torn={torn}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# Shared-memory market snapshot (one publisher process, many reader processes)
+import logging
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+from config import MARKET_FEED_SHM_NAME, MARKET_FEED_KLINE_INTERVAL, MARKET_FEED_MAX_AGE
+
+# Segment layout (little-endian, fixed size once created):
+#   header:        magic(8s) n_slots(I) slot_size(I) closed(Q) heartbeat(d)
+#   symbol table:  n_slots x symbol(16s)
+#   slots:         n_slots x slot_size bytes, each starting with a seqlock counter
+#                  and a bitmask of the field groups received so far
+# Slots are 128 bytes and 128-byte aligned so two symbols never share a cache line.
+# The heartbeat is the publisher's time.monotonic() at its last update, so
+# readers can tell a stopped or stalled feed from a quiet market.
+MAGIC = b"BBFEED02"
+HEADER = struct.Struct("<8sIIQd")
+STATE = struct.Struct("<Qd")
+STATE_OFFSET = 16
+SYMBOL = struct.Struct("<16s")
+SEQ = struct.Struct("<Q")
+# seq, groups, then bid, ask, mark, kline open time, open, high, low, close, volume, event time
+RECORD = struct.Struct("<QQdddqdddddq")
+SLOT_SIZE = 128
+FIELDS = ('bid', 'ask', 'mark_price', 'kline_open_time', 'open', 'high', 'low', 'close', 'volume', 'event_time')
+
+# Each stream fills a group of fields; a group stays unset until its first update.
+BOOK = 1
+MARK = 2
+KLINE = 4
+FIELD_GROUPS = {
+    'bid': BOOK,
+    'ask': BOOK,
+    'mark_price': MARK,
+    'kline_open_time': KLINE,
+    'open': KLINE,
+    'high': KLINE,
+    'low': KLINE,
+    'close': KLINE,
+    'volume': KLINE,
+}
+
+READ_TIMEOUT = 0.5  # seconds a reader waits for an in-progress write
+
+
+def _segment_size(n_slots):
+    return _slot_offset(n_slots, n_slots)
+
+
+def _slot_offset(n_slots, index):
+    table_end = HEADER.size + n_slots * SYMBOL.size
+    return -(-table_end // SLOT_SIZE) * SLOT_SIZE + index * SLOT_SIZE
+
+
+def _attach(name):
+    # Attaching must not register the segment with the resource tracker, or the
+    # tracker unlinks the publisher's segment when the reader process exits.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Older versions always register, and unregistering afterwards would also
+    # drop the publisher's own registration when it shares the tracker (same
+    # process or a child of it), so skip the registration instead.
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class MarketSnapshotWriter:
+    """Owns the shared-memory segment and writes per-symbol records under a seqlock.
+
+    Only one writer may exist per segment; readers never take a lock.
+    """
+
+    def __init__(self, symbols, name=MARKET_FEED_SHM_NAME):
+        # One slot per symbol, in first-seen order
+        self.symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        for symbol in self.symbols:
+            if len(symbol.encode()) > SYMBOL.size:
+                raise ValueError(f"Symbol {symbol} is longer than {SYMBOL.size} bytes.")
+        n_slots = len(self.symbols)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=_segment_size(n_slots))
+        self.buf = self.shm.buf
+        HEADER.pack_into(self.buf, 0, MAGIC, n_slots, SLOT_SIZE, 0, time.monotonic())
+        self._offsets = {}
+        self._records = {}
+        for i, symbol in enumerate(self.symbols):
+            SYMBOL.pack_into(self.buf, HEADER.size + i * SYMBOL.size, symbol.encode())
+            offset = _slot_offset(n_slots, i)
+            SEQ.pack_into(self.buf, offset, 0)
+            self._offsets[symbol] = offset
+            self._records[symbol] = [0, 0, 0.0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, 0]
+
+    def update(self, symbol, **fields):
+        # Build and serialize the new record before touching shared memory, so a
+        # bad field leaves both the slot and the cached record unchanged.
+        symbol = symbol.upper()
+        for key in fields:
+            if key not in FIELDS:
+                raise ValueError(f"Unknown market feed field '{key}'.")
+        record = list(self._records[symbol])
+        for key, value in fields.items():
+            record[FIELDS.index(key) + 2] = value
+            record[1] |= FIELD_GROUPS.get(key, 0)
+        seq = record[0]
+        record[0] = seq + 1
+        data = RECORD.pack(*record)
+        offset = self._offsets[symbol]
+        SEQ.pack_into(self.buf, offset, seq + 1)  # odd: write in progress
+        self.buf[offset:offset + RECORD.size] = data
+        SEQ.pack_into(self.buf, offset, seq + 2)  # even: record is consistent
+        record[0] = seq + 2
+        self._records[symbol] = record
+        STATE.pack_into(self.buf, STATE_OFFSET, 0, time.monotonic())
+
+    def close(self):
+        # Mark the feed closed first so readers that stay attached stop trusting it
+        STATE.pack_into(self.buf, STATE_OFFSET, 1, time.monotonic())
+        self.buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class MarketSnapshotReader:
+    """Attaches to an existing segment and reads records without blocking the writer."""
+
+    def __init__(self, name=MARKET_FEED_SHM_NAME, max_age=MARKET_FEED_MAX_AGE):
+        self.max_age = max_age
+        self.shm = _attach(name)
+        self.buf = self.shm.buf
+        magic, n_slots, slot_size, _, _ = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or slot_size != SLOT_SIZE:
+            self.close()
+            raise ValueError(f"Shared memory segment '{name}' is not a market feed snapshot.")
+        self._offsets = {}
+        for i in range(n_slots):
+            symbol = SYMBOL.unpack_from(self.buf, HEADER.size + i * SYMBOL.size)[0].rstrip(b"\0").decode()
+            self._offsets[symbol] = _slot_offset(n_slots, i)
+        self.symbols = list(self._offsets)
+
+    def read_raw(self, symbol):
+        # Seqlock read: retry while a write is in progress or the record changed underneath us.
+        offset = self._offsets[symbol]
+        buf = self.buf
+        values = RECORD.unpack_from(buf, offset)
+        if not values[0] & 1 and SEQ.unpack_from(buf, offset)[0] == values[0]:
+            return values[0], values[1], values[2:]
+        deadline = time.monotonic() + READ_TIMEOUT
+        while time.monotonic() < deadline:
+            # Give the writer a chance to finish if it was preempted mid-update
+            time.sleep(0)
+            values = RECORD.unpack_from(buf, offset)
+            if not values[0] & 1 and SEQ.unpack_from(buf, offset)[0] == values[0]:
+                return values[0], values[1], values[2:]
+        raise TimeoutError(f"Could not get a consistent snapshot for {symbol}.")
+
+    def read(self, symbol):
+        symbol = symbol.upper()
+        if symbol not in self._offsets:
+            return None, f"{symbol} is not published by the market feed."
+        closed, heartbeat = STATE.unpack_from(self.buf, STATE_OFFSET)
+        if closed:
+            return None, "Market feed has stopped."
+        age = time.monotonic() - heartbeat
+        if age > self.max_age:
+            return None, f"Market feed is stale (no update for {age:.1f}s)."
+        try:
+            seq, groups, values = self.read_raw(symbol)
+        except TimeoutError as e:
+            return None, str(e)
+        if not groups:
+            return None, f"No market data received yet for {symbol}."
+        # Fields whose stream has not delivered yet are None, never a zero price
+        snapshot = {}
+        for field, value in zip(FIELDS, values):
+            group = FIELD_GROUPS.get(field)
+            snapshot[field] = None if group and not groups & group else value
+        return snapshot, None
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+
+class MarketFeedPublisher:
+    """Streams book ticker, mark price and kline updates into a MarketSnapshotWriter."""
+
+    def __init__(self, symbols, name=MARKET_FEED_SHM_NAME, interval=MARKET_FEED_KLINE_INTERVAL):
+        self.interval = interval
+        self.writer = MarketSnapshotWriter(symbols, name=name)
+        self.symbols = self.writer.symbols
+        self.logger = logging.getLogger("bot")
+
+    def handle_message(self, msg):
+        data = msg.get('data', msg)
+        event = data.get('e')
+        if event == 'bookTicker':
+            self.writer.update(data['s'], bid=float(data['b']), ask=float(data['a']), event_time=int(data.get('E', 0)))
+        elif event == 'markPriceUpdate':
+            self.writer.update(data['s'], mark_price=float(data['p']), event_time=int(data['E']))
+        elif event == 'kline':
+            k = data['k']
+            self.writer.update(
+                data['s'],
+                kline_open_time=int(k['t']),
+                open=float(k['o']),
+                high=float(k['h']),
+                low=float(k['l']),
+                close=float(k['c']),
+                volume=float(k['v']),
+                event_time=int(data['E'])
+            )
+        elif event == 'error':
+            self.logger.error(f"Market Feed Error: {data.get('m')}")
+
+    def run(self):
+        streams = []
+        for symbol in self.symbols:
+            s = symbol.lower()
+            streams += [f"{s}@bookTicker", f"{s}@markPrice@1s", f"{s}@kline_{self.interval}"]
+        twm = None
+        try:
+            from binance import ThreadedWebsocketManager
+            from config import BINANCE_API_KEY, BINANCE_SECRET_KEY
+            twm = ThreadedWebsocketManager(api_key=BINANCE_API_KEY, api_secret=BINANCE_SECRET_KEY, testnet=True)
+            twm.start()
+            self.logger.info(f"Market Feed Started: {self.symbols}, Streams: {streams}")
+            twm.start_futures_multiplex_socket(callback=self.handle_message, streams=streams)
+            while twm.is_alive():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if twm is not None:
+                # Wait for the listener thread so no handle_message() call can
+                # write into the segment while or after it is closed
+                twm.stop()
+                twm.join()
+            self.writer.close()
+            self.logger.info("Market Feed Stopped")
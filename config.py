@@ -8,3 +8,8 @@ WEBSOCKET_URL = "wss://fstream.binancefuture.com"
 
 BINANCE_API_KEY = os.environ.get("BINANCE_API_KEY")
 BINANCE_SECRET_KEY = os.environ.get("BINANCE_SECRET_KEY")
+
+# Shared-memory market snapshot written by `python main.py feed`
+MARKET_FEED_SHM_NAME = os.environ.get("MARKET_FEED_SHM_NAME", "binance_bot_feed")
+MARKET_FEED_KLINE_INTERVAL = "1m"
+MARKET_FEED_MAX_AGE = 5.0  # seconds without an update before readers treat the feed as stale
@@ -10,10 +10,14 @@ def print_usage():
 Usage:
   python main.py market buy|sell SYMBOL QUANTITY
   python main.py limit buy|sell SYMBOL QUANTITY PRICE
+  python main.py feed SYMBOL [SYMBOL ...]
+  python main.py price SYMBOL
   # Advanced order types can be added here
 Example:
   python main.py market buy BTCUSDT 0.01
   python main.py limit sell ETHUSDT 0.05 1800.50
+  python main.py feed BTCUSDT ETHUSDT
+  python main.py price BTCUSDT
     """)
 
 def main():
@@ -24,10 +28,61 @@ def main():
         print_usage()
         return
 
+    order_type = args[0].lower()
+    # The market feed commands never place orders, so skip the REST clients below
+    if order_type == "feed":
+        # Usage: python main.py feed SYMBOL [SYMBOL ...]
+        if len(args) < 2:
+            print("Usage: python main.py feed SYMBOL [SYMBOL ...]")
+            return
+        symbols = args[1:]
+        validator = Validator()
+        for symbol in symbols:
+            valid, msg = validator.validate_symbol(symbol)
+            if not valid:
+                print(f"Error: {msg}")
+                logger.error(f"Invalid Market Feed Input: {msg}")
+                return
+        from bot.market_feed import MarketFeedPublisher
+        try:
+            publisher = MarketFeedPublisher(symbols)
+        except FileExistsError:
+            print("Error: A market feed is already running.")
+            return
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        print(f"Publishing market data for {', '.join(publisher.symbols)} (Ctrl+C to stop)")
+        publisher.run()
+        return
+
+    if order_type == "price":
+        # Usage: python main.py price SYMBOL
+        if len(args) != 2:
+            print("Usage: python main.py price SYMBOL")
+            return
+        from bot.market_feed import MarketSnapshotReader
+        try:
+            reader = MarketSnapshotReader()
+        except FileNotFoundError:
+            print("Error: No market feed is running. Start one with 'python main.py feed SYMBOL'.")
+            return
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        snapshot, error = reader.read(args[1])
+        reader.close()
+        if error:
+            print(f"Error: {error}")
+        else:
+            print(f"Market Snapshot for {args[1].upper()}:")
+            for k, v in snapshot.items():
+                print(f"{k}: {v}")
+        return
+
     order_manager = OrderManager()
     validator = Validator()
 
-    order_type = args[0].lower()
     if order_type == "market":
         if len(args) != 4:
             print("Error: Invalid arguments for market order.")